@@ -4,63 +4,117 @@ Works with any PDF file. Uses PyMuPDF (fitz) - no system dependencies required!
 """
 import fitz  # PyMuPDF
 from PIL import Image
-import io
+import concurrent.futures
+import os
+from itertools import repeat
 
 
-def compress_pdf(input_path, output_path, quality=85, max_dimension=2000):
+def _open_pdf(src):
+    """Open a PDF from a filesystem path or from in-memory bytes."""
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=src, filetype='pdf')
+    return fitz.open(src)
+
+
+# Source PDF for this worker process, set once by the pool initializer so
+# in-memory sources aren't re-pickled to the workers for every page
+_worker_src = None
+
+
+def _init_worker(src):
+    global _worker_src
+    _worker_src = src
+
+
+def _render_and_encode(page_num, quality, max_dimension):
+    """
+    Worker: render one page and return (width, height, jpeg_bytes).
+
+    Each worker opens the PDF itself (opening is cheap compared to the
+    render) so the whole render/resize/encode runs in its own process -
+    PyMuPDF holds the GIL while rendering, so threads don't help here
+    but processes spread the pages across CPU cores.
+    """
+    pdf_document = _open_pdf(_worker_src)
+    page = pdf_document[page_num]
+    rect = page.rect
+
+    # Render at the scale that lands the pixmap within max_dimension
+    # directly instead of rendering at a fixed 2.0 and downscaling the
+    # result - MuPDF filters during rasterization, so the big
+    # intermediate pixmap and the whole resize step disappear.
+    # Capped at 2.0 (144 DPI) which was the previous fixed quality
+    scale = min(2.0, max_dimension / max(rect.width, rect.height))
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+
+    # The target-scale render keeps the pixmap within bounds in practice;
+    # if one still comes out oversized, halve it in place with MuPDF's
+    # box-average shrink - native C on the existing buffer, no PIL trip
+    while pix.width > max_dimension or pix.height > max_dimension:
+        pix.shrink(1)
+
+    # Encode straight from the pixmap with MuPDF's own JPEG encoder
+    img_bytes = pix.tobytes(output="jpeg", jpg_quality=quality)
+
+    pdf_document.close()
+    return rect.width, rect.height, img_bytes
+
+
+def compress_pdf(input_src, output_path, quality=85, max_dimension=2000):
     """
     Compress a PDF by rendering each page as an image and reducing quality/size.
     This method preserves both images AND text from the original PDF.
 
     Args:
-        input_path: Path to input PDF
+        input_src: Path to input PDF, or the PDF contents as bytes
         output_path: Path to save compressed PDF
         quality: JPEG quality (1-100, default 85)
         max_dimension: Maximum width/height for images (default 2000px)
     """
-    print(f"Compressing PDF: {input_path}")
+    if isinstance(input_src, (bytes, bytearray, memoryview)):
+        print(f"Compressing PDF from memory ({len(input_src)} bytes)")
+    else:
+        print(f"Compressing PDF: {input_src}")
 
-    # Open the PDF
-    pdf_document = fitz.open(input_path)
+    # Open the PDF just to count pages - the per-page work runs in workers
+    pdf_document = _open_pdf(input_src)
     total_pages = len(pdf_document)
+    pdf_document.close()
     print(f"Total pages: {total_pages}")
 
     # Create output PDF
     output_pdf = fitz.open()
 
-    for page_num in range(total_pages):
-        print(f"Processing page {page_num + 1}/{total_pages}...")
-
-        # Get the page
-        page = pdf_document[page_num]
+    # Collect per-page status and write it once - a print+flush per page
+    # is a syscall per page for no benefit in a server log
+    status_lines = []
 
-        # Render page to image (pixmap)
-        # Use matrix to scale down if needed (2.0 = 144 DPI, good quality)
-        mat = fitz.Matrix(2.0, 2.0)
-        pix = page.get_pixmap(matrix=mat)
+    # Render and encode every page across CPU cores; map() yields results
+    # in page order, so only the cheap stitching stays serial. The source
+    # (path or bytes) goes to each worker once via the initializer
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, 4),
+            initializer=_init_worker, initargs=(input_src,)) as executor:
+        results = executor.map(
+            _render_and_encode,
+            range(total_pages),
+            repeat(quality), repeat(max_dimension),
+            chunksize=2)
 
-        # Convert pixmap to PIL Image
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        for page_num, (width, height, img_bytes) in enumerate(results):
+            status_lines.append(f"Processing page {page_num + 1}/{total_pages}...")
 
-        # Compress the image
-        compressed_img = compress_image(img, quality, max_dimension)
+            # Create new page with same dimensions as original
+            new_page = output_pdf.new_page(width=width, height=height)
 
-        # Convert back to bytes for PyMuPDF
-        img_buffer = io.BytesIO()
-        compressed_img.save(img_buffer, format='JPEG', quality=quality, optimize=True)
-        img_bytes = img_buffer.getvalue()
+            # Insert the compressed image
+            new_page.insert_image(new_page.rect, stream=img_bytes)
 
-        # Create new page with same dimensions as original
-        rect = page.rect
-        new_page = output_pdf.new_page(width=rect.width, height=rect.height)
-
-        # Insert the compressed image
-        new_page.insert_image(rect, stream=img_bytes)
+    print("\n".join(status_lines))
 
     # Save the output PDF
     output_pdf.save(output_path, garbage=4, deflate=True)
     output_pdf.close()
-    pdf_document.close()
 
     print(f"Compressed PDF saved: {output_path}")
     print(f"Total pages in output: {total_pages}")
@@ -78,12 +132,20 @@ def compress_image(img, quality=85, max_dimension=2000):
     Returns:
         Compressed PIL Image
     """
-    # Resize if too large
+    # Resize if too large. Lanczos is ~4-5x the cost of bilinear; at heavy
+    # downscales the cheaper filters are indistinguishable after JPEG
+    # quantization, so pick the filter by how far we're shrinking
     if img.width > max_dimension or img.height > max_dimension:
         ratio = min(max_dimension / img.width, max_dimension / img.height)
+        if ratio > 0.5:
+            resample = Image.Resampling.LANCZOS
+        elif ratio > 0.25:
+            resample = Image.Resampling.BICUBIC
+        else:
+            resample = Image.Resampling.BILINEAR
         new_width = int(img.width * ratio)
         new_height = int(img.height * ratio)
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        img = img.resize((new_width, new_height), resample)
 
     # Convert to RGB if necessary (for JPEG)
     if img.mode not in ('RGB', 'L'):
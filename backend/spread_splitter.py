@@ -4,7 +4,73 @@ Replicates what StoryJar.app does: one image OR text per page.
 """
 import fitz  # PyMuPDF
 from PIL import Image
+import concurrent.futures
 import io
+import os
+from itertools import repeat
+
+
+# A4 portrait output page in points at 72 DPI - shared by every page
+# instead of rebuilding the same small fitz objects per iteration
+A4_RECT = fitz.Rect(0, 0, 595, 842)
+
+# One encode buffer per worker process, reused across halves - it grows to
+# the largest half-page's JPEG size once instead of a fresh allocation each
+_jpeg_buffer = io.BytesIO()
+
+
+def _split_page(input_path, page_num, quality, max_dimension):
+    """
+    Worker: render one source page and return its output page(s) as JPEG bytes.
+
+    Returns one stream for the cover (page 0, right half only) and two
+    for every spread - right half (text) first, then left half (image),
+    matching the StoryJar page order. Runs in its own process so the
+    render/crop/resize/encode work spreads across CPU cores.
+    """
+    pdf_document = fitz.open(input_path)
+    page = pdf_document[page_num]
+    rect = page.rect
+
+    # Render at the scale where half a spread just fills an A4 output
+    # page (595x842 px) rather than at a fixed 2.0 and downscaling later.
+    # MuPDF filters while rasterizing, so this skips the oversized
+    # intermediate pixmap; capped at 2.0 (144 DPI, the old quality)
+    scale = min(2.0, max(595 / (rect.width / 2), 842 / rect.height))
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+
+    # Wrap the pixmap's memory directly instead of copying it - samples_mv
+    # is a memoryview into the C buffer and frombuffer doesn't copy. The
+    # crops/resizes below all create new images, and pix stays alive in
+    # this scope for as long as the view is in use
+    img = Image.frombuffer("RGB", (pix.width, pix.height),
+                           pix.samples_mv, "raw", "RGB", 0, 1)
+
+    # Compress image
+    img_compressed = compress_image(img, quality, max_dimension)
+
+    width, height = img_compressed.size
+    mid = width >> 1
+
+    if page_num == 0:
+        halves = [img_compressed.crop((mid, 0, width, height))]
+    else:
+        halves = [img_compressed.crop((mid, 0, width, height)),
+                  img_compressed.crop((0, 0, mid, height))]
+
+    streams = []
+    for half in halves:
+        filled = resize_to_fill_a4(half)
+        _jpeg_buffer.seek(0)
+        _jpeg_buffer.truncate()
+        # Single-pass encode: optimize=True's extra Huffman pass buys ~3-5%
+        # size for a big chunk of the per-page time
+        filled.save(_jpeg_buffer, format='JPEG', quality=quality,
+                    optimize=False, progressive=False, subsampling=2)
+        streams.append(_jpeg_buffer.getvalue())
+
+    pdf_document.close()
+    return streams
 
 
 def split_gemini_spreads(input_path, output_path, quality=85, max_dimension=2000):
@@ -28,9 +94,10 @@ def split_gemini_spreads(input_path, output_path, quality=85, max_dimension=2000
     """
     print(f"Splitting Gemini spreads from: {input_path}")
 
-    # Open source PDF
+    # Open source PDF just to count pages - the per-page work runs in workers
     pdf_document = fitz.open(input_path)
     total_pages = len(pdf_document)
+    pdf_document.close()
 
     print(f"Original PDF has {total_pages} pages")
 
@@ -39,77 +106,30 @@ def split_gemini_spreads(input_path, output_path, quality=85, max_dimension=2000
 
     individual_page_count = 0
 
-    for page_num in range(total_pages):
-        page = pdf_document[page_num]
-
-        # Render page at 144 DPI for good quality
-        mat = fitz.Matrix(2.0, 2.0)
-        pix = page.get_pixmap(matrix=mat)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-        # Compress image
-        img_compressed = compress_image(img, quality, max_dimension)
+    # Per-page status is batched into one write at the end of the loop
+    status_lines = []
 
-        if page_num == 0:
-            # First page: Cover - take RIGHT half only (like other pages)
-            print(f"  Page {page_num + 1}: Cover (taking right half)")
+    # Render/crop/resize/encode every spread across CPU cores; only the
+    # cheap page assembly stays serial so output order is preserved
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(
+            _split_page,
+            repeat(input_path), range(total_pages),
+            repeat(quality), repeat(max_dimension),
+            chunksize=2)
 
-            # Split in half and take right side (cover)
-            width, height = img_compressed.size
-            mid = width // 2
-            cover_img = img_compressed.crop((mid, 0, width, height))
+        for page_num, streams in enumerate(results):
+            if page_num == 0:
+                status_lines.append(f"  Page {page_num + 1}: Cover (taking right half)")
+            else:
+                status_lines.append(f"  Page {page_num + 1}: Split → Right (text) + Left (image)")
 
-            # Create A4 portrait page
-            pdf_page = output_pdf.new_page(width=595, height=842)
+            for stream in streams:
+                pdf_page = output_pdf.new_page(width=595, height=842)
+                pdf_page.insert_image(A4_RECT, stream=stream)
+                individual_page_count += 1
 
-            # Resize to fill A4
-            img_filled = resize_to_fill_a4(cover_img)
-
-            # Convert to JPEG
-            img_buffer = io.BytesIO()
-            img_filled.save(img_buffer, format='JPEG', quality=quality, optimize=True)
-
-            # Insert filling entire A4
-            pdf_page.insert_image(fitz.Rect(0, 0, 595, 842), stream=img_buffer.getvalue())
-
-            individual_page_count += 1
-
-        else:
-            # Split spread in half
-            width, height = img_compressed.size
-            mid = width // 2
-
-            # Right half FIRST (text) - like StoryJar
-            right_img = img_compressed.crop((mid, 0, width, height))
-            print(f"  Page {page_num + 1}: Split → Right (text)")
-
-            # Create A4 page for right half
-            pdf_page_right = output_pdf.new_page(width=595, height=842)
-            right_filled = resize_to_fill_a4(right_img)
-
-            right_buffer = io.BytesIO()
-            right_filled.save(right_buffer, format='JPEG', quality=quality, optimize=True)
-
-            pdf_page_right.insert_image(fitz.Rect(0, 0, 595, 842), stream=right_buffer.getvalue())
-
-            individual_page_count += 1
-
-            # Left half SECOND (image)
-            left_img = img_compressed.crop((0, 0, mid, height))
-            print(f"  Page {page_num + 1}: Split → Left (image)")
-
-            # Create A4 page for left half
-            pdf_page_left = output_pdf.new_page(width=595, height=842)
-            left_filled = resize_to_fill_a4(left_img)
-
-            left_buffer = io.BytesIO()
-            left_filled.save(left_buffer, format='JPEG', quality=quality, optimize=True)
-
-            pdf_page_left.insert_image(fitz.Rect(0, 0, 595, 842), stream=left_buffer.getvalue())
-
-            individual_page_count += 1
-
-    pdf_document.close()
+    print("\n".join(status_lines))
 
     # Save output PDF
     output_pdf.save(output_path, garbage=4, deflate=True)
@@ -136,23 +156,36 @@ def resize_to_fill_a4(image):
 
     width, height = image.size
 
-    # Calculate ratio to fill (use max instead of min to fill, not fit)
-    ratio = max(target_width / width, target_height / height)
-
-    # Resize to fill
-    new_width = int(width * ratio)
-    new_height = int(height * ratio)
-    img_resized = image.resize((new_width, new_height), Image.LANCZOS)
-
-    # Crop to exact A4 size if needed (center crop)
-    if new_width > target_width or new_height > target_height:
-        left = (new_width - target_width) // 2
-        top = (new_height - target_height) // 2
-        right = left + target_width
-        bottom = top + target_height
-        img_resized = img_resized.crop((left, top, right, bottom))
-
-    return img_resized
+    # Crop first, then resize once. The old order resized the full image
+    # to cover A4 and then center-cropped, filtering pixels that were
+    # about to be thrown away; cropping the A4-aspect window out of the
+    # source first means the single resize only touches pixels that end
+    # up on the page
+    if width * target_height > height * target_width:
+        # Wider than A4 - crop the sides
+        crop_width = round(height * target_width / target_height)
+        left = (width - crop_width) // 2
+        image = image.crop((left, 0, left + crop_width, height))
+    elif width * target_height < height * target_width:
+        # Taller than A4 - crop top and bottom
+        crop_height = round(width * target_height / target_width)
+        top = (height - crop_height) // 2
+        image = image.crop((0, top, width, top + crop_height))
+
+    if image.size == (target_width, target_height):
+        return image
+
+    # Same ratio-based filter choice as compress_image: Lanczos near 1:1
+    # (and for upscales), cheaper kernels for heavy downscales
+    ratio = target_width / image.width
+    if ratio > 0.5:
+        resample = Image.LANCZOS
+    elif ratio > 0.25:
+        resample = Image.BICUBIC
+    else:
+        resample = Image.BILINEAR
+
+    return image.resize((target_width, target_height), resample)
 
 
 def resize_to_fit_a4(image):
@@ -214,12 +247,20 @@ def compress_image(image, quality=85, max_dimension=2000):
     elif image.mode != 'RGB':
         image = image.convert('RGB')
 
-    # Resize if too large
+    # Resize if too large. Filter picked by shrink ratio - Lanczos only
+    # pays off near 1:1; heavier downscales look the same after JPEG
+    # quantization with the cheaper kernels
     width, height = image.size
     if width > max_dimension or height > max_dimension:
         ratio = min(max_dimension / width, max_dimension / height)
+        if ratio > 0.5:
+            resample = Image.LANCZOS
+        elif ratio > 0.25:
+            resample = Image.BICUBIC
+        else:
+            resample = Image.BILINEAR
         new_width = int(width * ratio)
         new_height = int(height * ratio)
-        image = image.resize((new_width, new_height), Image.LANCZOS)
+        image = image.resize((new_width, new_height), resample)
 
     return image